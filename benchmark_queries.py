@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark the web application's hot queries against the configured database.
+Run it once per schema variant (see generate_schema.py flags) to compare
+storage and distribution choices. Reports latency percentiles per query and,
+with --explain, how many Motion nodes each plan needs on Greenplum.
+"""
+import sys
+import json
+import contextlib
+import time
+import argparse
+import numpy as np
+import psycopg2
+from pgvector.psycopg2 import register_vector
+# config prints its settings on import; keep them off stdout so --json stays parseable
+with contextlib.redirect_stdout(sys.stderr):
+    import cluster_versions
+    from config import get_connection_string
+
+QUERIES = {
+    'stats': """
+        SELECT COUNT(*), COUNT(b.embedding), COUNT(DISTINCT a.cluster_id), COUNT(DISTINCT b.category)
+        FROM blog_posts b
+        LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %(version)s
+        WHERE b.embedding IS NOT NULL
+    """,
+    'cluster_samples': """
+        SELECT b.title, b.description
+        FROM blog_cluster_assignments a
+        JOIN blog_posts b ON b.id = a.post_id
+        WHERE a.version = %(version)s AND a.cluster_id = %(cluster_id)s AND b.embedding IS NOT NULL
+        LIMIT 5
+    """,
+    'cluster_size': """
+        SELECT COUNT(*)
+        FROM blog_cluster_assignments
+        WHERE version = %(version)s AND cluster_id = %(cluster_id)s
+    """,
+    'centroids_aggregated': """
+        SELECT s.cluster_id, s.summary, AVG(b.embedding)::vector
+        FROM blog_cluster_summaries s
+        JOIN blog_cluster_assignments a ON a.version = s.version AND a.cluster_id = s.cluster_id
+        JOIN blog_posts b ON b.id = a.post_id
+        WHERE s.version = %(version)s AND b.embedding IS NOT NULL
+        GROUP BY s.cluster_id, s.summary
+        ORDER BY s.cluster_id
+    """,
+    'centroids_materialized': """
+        SELECT s.cluster_id, s.summary, c.centroid
+        FROM blog_cluster_summaries s
+        JOIN blog_cluster_centroids c ON c.version = s.version AND c.cluster_id = s.cluster_id
+        WHERE s.version = %(version)s
+        ORDER BY s.cluster_id
+    """,
+    'nearest_25': """
+        SELECT b.id, b.title, b.description, a.cluster_id
+        FROM blog_posts b
+        LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %(version)s
+        WHERE b.embedding IS NOT NULL
+        ORDER BY b.embedding <-> %(vector)s ASC
+        LIMIT 25
+    """,
+}
+
+
+def time_query(cur, sql, params, iterations):
+    """Run a query repeatedly and return per-run latencies in milliseconds"""
+    cur.execute(sql, params)  # warm-up
+    cur.fetchall()
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        cur.execute(sql, params)
+        cur.fetchall()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def count_motions(cur, sql, params):
+    """Number of Motion nodes (redistribute/broadcast/gather) in the plan"""
+    cur.execute("EXPLAIN " + sql, params)
+    return sum(1 for (line,) in cur.fetchall() if 'Motion' in line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the web application's hot queries")
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--explain', action='store_true', help='Also count Motion nodes per plan')
+    parser.add_argument('--label', default='', help='Name of the schema variant being measured')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    conn = psycopg2.connect(get_connection_string())
+    conn.autocommit = True
+    register_vector(conn)
+    cur = conn.cursor()
+
+    version = cluster_versions.current_version(cur)
+    if version is None:
+        sys.exit("No published clustering version - run cluster.sql and summarize.py first")
+
+    cur.execute("SELECT cluster_id, centroid FROM blog_cluster_centroids WHERE version = %s LIMIT 1", (version,))
+    row = cur.fetchone()
+    if row is None:
+        sys.exit("No centroids for the published version - run migrate_cluster_centroids.sql")
+    params = {'version': version, 'cluster_id': row[0], 'vector': row[1]}
+
+    results = []
+    for name, sql in QUERIES.items():
+        latencies = time_query(cur, sql, params, args.iterations)
+        result = {
+            'query': name,
+            'mean_ms': float(np.mean(latencies)),
+            'p50_ms': float(np.percentile(latencies, 50)),
+            'p95_ms': float(np.percentile(latencies, 95)),
+        }
+        if args.explain:
+            result['motions'] = count_motions(cur, sql, params)
+        results.append(result)
+        print(f"  {name} done", file=sys.stderr)
+
+    cur.close()
+    conn.close()
+
+    if args.json:
+        print(json.dumps({'label': args.label, 'version': version, 'results': results}, indent=2))
+        return
+
+    if args.label:
+        print(f"Schema variant: {args.label}")
+    header = f"{'query':<24}  {'mean_ms':>9}  {'p50_ms':>9}  {'p95_ms':>9}"
+    print(header + (f"  {'motions':>7}" if args.explain else ''))
+    for result in results:
+        line = f"{result['query']:<24}  {result['mean_ms']:>9.2f}  {result['p50_ms']:>9.2f}  {result['p95_ms']:>9.2f}"
+        if args.explain:
+            line += f"  {result['motions']:>7}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,19 @@
 
 -- 1. KMeans UDF (already created once — no need to recreate unless changing code)
 
--- 2. Run clustering on embeddings and update table
+-- 2. Run clustering on embeddings and write the assignments as a new version
+--    To inspect the plan (e.g. gather motions for array_agg), run the statement as
+--    EXPLAIN (ANALYZE, BUFFERS) inside BEGIN; ... ROLLBACK; so assignments are untouched.
+--    The version stays staged (readers keep the published one) until summarize.py
+--    has summarized it and swapped the blog_cluster_current pointer.
+BEGIN;
+
+-- psql substitutes :version as a literal; currval() is not supported on segments
+INSERT INTO blog_cluster_versions (version, num_clusters)
+VALUES (nextval('blog_cluster_version_seq'), 16)
+RETURNING version \gset
+
+INSERT INTO blog_cluster_assignments (version, post_id, cluster_id)
 WITH data AS (
     SELECT id,
            string_to_array(trim(both '[]' from embedding::text), ',')::float8[] AS vec
@@ -20,12 +32,8 @@ clusters AS (
                generate_subscripts(all_ids, 1) AS rn
         FROM agg
     ) t
-),
-mapping AS (
-    SELECT all_ids[rn] AS id, cluster_id
-    FROM clusters, agg
 )
-UPDATE blog_posts p
-SET cluster_id = m.cluster_id
-FROM mapping m
-WHERE p.id = m.id;
+SELECT :version, all_ids[rn], cluster_id
+FROM clusters, agg;
+
+COMMIT;
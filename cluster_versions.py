@@ -0,0 +1,96 @@
+"""
+Versioned cluster assignments.
+Each clustering run writes a complete set of (version, post_id, cluster_id)
+rows into blog_cluster_assignments and its summaries into
+blog_cluster_summaries under the same version. Readers resolve the published
+version once from the single-row blog_cluster_current pointer, so they never
+see a half-written clustering; publishing is a one-row UPDATE of that pointer.
+Centroids are materialized per version at publish time so recommendation
+requests read them directly instead of re-aggregating every embedding.
+"""
+from config import CLUSTER_VERSIONS_RETAINED
+
+# Requests that resolved the pointer just before a publish keep reading the
+# version it replaced, so the most recently published versions survive GC.
+PUBLISHED_VERSIONS_RETAINED = 2
+
+
+def current_version(cur):
+    """Published clustering version, or None before the first publish"""
+    cur.execute("SELECT version FROM blog_cluster_current")
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def latest_version(cur):
+    """Newest clustering version, published or still staged"""
+    cur.execute("SELECT MAX(version) FROM blog_cluster_versions")
+    return cur.fetchone()[0]
+
+
+def version_exists(cur, version):
+    """Whether a clustering version has been registered (published or staged)"""
+    cur.execute("SELECT 1 FROM blog_cluster_versions WHERE version = %s", (version,))
+    return cur.fetchone() is not None
+
+
+def create_version(cur, num_clusters):
+    """Register a new, unpublished clustering version and return its number"""
+    cur.execute("""
+        INSERT INTO blog_cluster_versions (version, num_clusters)
+        VALUES (nextval('blog_cluster_version_seq'), %s)
+        RETURNING version
+    """, (num_clusters,))
+    return cur.fetchone()[0]
+
+
+def store_centroids(cur, version):
+    """Materialize the mean embedding of every cluster in a version"""
+    cur.execute("DELETE FROM blog_cluster_centroids WHERE version = %s", (version,))
+    cur.execute("""
+        INSERT INTO blog_cluster_centroids (version, cluster_id, centroid)
+        SELECT a.version, a.cluster_id, AVG(b.embedding)
+        FROM blog_cluster_assignments a
+        JOIN blog_posts b ON b.id = a.post_id
+        WHERE a.version = %s AND b.embedding IS NOT NULL
+        GROUP BY a.version, a.cluster_id
+    """, (version,))
+
+
+def publish_version(cur, version):
+    """Store a version's centroids and atomically point readers at it (takes effect on commit)"""
+    store_centroids(cur, version)
+    cur.execute("UPDATE blog_cluster_versions SET published_at = now() WHERE version = %s", (version,))
+    cur.execute("UPDATE blog_cluster_current SET version = %s", (version,))
+
+
+def garbage_collect(cur, keep=CLUSTER_VERSIONS_RETAINED):
+    """Drop all but the newest `keep` versions.
+
+    Never drops the published version or the versions published just before
+    it, which in-flight requests may still be reading.
+
+    Returns the number of versions removed.
+    """
+    cur.execute("""
+        SELECT version
+        FROM blog_cluster_versions
+        WHERE version NOT IN (
+            SELECT version FROM blog_cluster_versions ORDER BY version DESC LIMIT %s
+        )
+        AND version NOT IN (
+            SELECT version FROM blog_cluster_versions
+            WHERE published_at IS NOT NULL
+            ORDER BY published_at DESC LIMIT %s
+        )
+        AND version IS DISTINCT FROM (SELECT version FROM blog_cluster_current)
+    """, (keep, PUBLISHED_VERSIONS_RETAINED))
+    stale = [row[0] for row in cur.fetchall()]
+    if not stale:
+        return 0
+
+    cur.execute("DELETE FROM blog_cluster_assignments WHERE version = ANY(%s)", (stale,))
+    cur.execute("DELETE FROM blog_cluster_summaries WHERE version = ANY(%s)", (stale,))
+    cur.execute("DELETE FROM blog_cluster_centroids WHERE version = ANY(%s)", (stale,))
+    cur.execute("DELETE FROM blog_cluster_versions WHERE version = ANY(%s)", (stale,))
+    return len(stale)
@@ -29,10 +29,29 @@ EMBEDDING_MODEL = os.getenv('EMBEDDING_MODEL', 'text-embedding-nomic-embed-text-
 EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '1536'))
 CHAT_MODEL = os.getenv('CHAT_MODEL', 'qwen/qwen3-4b-2507')
 CLUSTER_SAMPLE_SIZE = int(os.getenv('CLUSTER_SAMPLE_SIZE', '40'))
+CLUSTER_VERSIONS_RETAINED = int(os.getenv('CLUSTER_VERSIONS_RETAINED', '3'))
+
+# Recommendation Reranking Defaults (overridable per request)
+RERANK_POOL_SIZE = int(os.getenv('RERANK_POOL_SIZE', '200'))
+RERANK_MMR_LAMBDA = float(os.getenv('RERANK_MMR_LAMBDA', '0.7'))
+RERANK_MAX_PER_CLUSTER = int(os.getenv('RERANK_MAX_PER_CLUSTER', '5'))
+MULTI_VECTOR_MIN_RATING = float(os.getenv('MULTI_VECTOR_MIN_RATING', '6'))
+MULTI_VECTOR_PROBES = int(os.getenv('MULTI_VECTOR_PROBES', '3'))
+
+# Search Configuration
+SEARCH_CANDIDATES = int(os.getenv('SEARCH_CANDIDATES', '50'))
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv('QUERY_EMBEDDING_CACHE_SIZE', '512'))
 
 # Web Application Configuration
 WEB_PORT = int(os.getenv('WEB_PORT', '8080'))
 
+# Instrumentation Configuration
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'false').lower() == 'true'
+SERVER_TIMING_ENABLED = os.getenv('SERVER_TIMING_ENABLED', 'false').lower() == 'true'
+QUERY_DIAGNOSTICS_ENABLED = os.getenv('QUERY_DIAGNOSTICS_ENABLED', 'false').lower() == 'true'
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '250'))
+EXPLAIN_SAMPLE_RATE = float(os.getenv('EXPLAIN_SAMPLE_RATE', '0.1'))
+
 # Connection string helper
 def get_connection_string():
     """Returns psycopg2 connection string"""
@@ -90,8 +109,21 @@ def _display_config():
     print(f"  EMBEDDING_DIMENSIONS: {EMBEDDING_DIMENSIONS}")
     print(f"  CHAT_MODEL: {CHAT_MODEL}")
     print(f"  CLUSTER_SAMPLE_SIZE: {CLUSTER_SAMPLE_SIZE}")
+    print(f"  CLUSTER_VERSIONS_RETAINED: {CLUSTER_VERSIONS_RETAINED}")
+    print(f"  RERANK_POOL_SIZE: {RERANK_POOL_SIZE}")
+    print(f"  RERANK_MMR_LAMBDA: {RERANK_MMR_LAMBDA}")
+    print(f"  RERANK_MAX_PER_CLUSTER: {RERANK_MAX_PER_CLUSTER}")
+    print(f"  MULTI_VECTOR_MIN_RATING: {MULTI_VECTOR_MIN_RATING}")
+    print(f"  MULTI_VECTOR_PROBES: {MULTI_VECTOR_PROBES}")
+    print(f"  SEARCH_CANDIDATES: {SEARCH_CANDIDATES}")
+    print(f"  QUERY_EMBEDDING_CACHE_SIZE: {QUERY_EMBEDDING_CACHE_SIZE}")
     print(f"\nWeb:")
     print(f"  WEB_PORT: {WEB_PORT}")
+    print(f"  METRICS_ENABLED: {METRICS_ENABLED}")
+    print(f"  SERVER_TIMING_ENABLED: {SERVER_TIMING_ENABLED}")
+    print(f"  QUERY_DIAGNOSTICS_ENABLED: {QUERY_DIAGNOSTICS_ENABLED}")
+    print(f"  SLOW_QUERY_MS: {SLOW_QUERY_MS}")
+    print(f"  EXPLAIN_SAMPLE_RATE: {EXPLAIN_SAMPLE_RATE}")
     print("=" * 50)
 
 # Display config when module is imported
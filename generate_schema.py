@@ -1,9 +1,56 @@
 #!/usr/bin/env python3
 """
-Generate schema.sql with the current EMBEDDING_DIMENSIONS from config
+Generate schema.sql with the current EMBEDDING_DIMENSIONS from config.
+Optional flags tune storage and distribution for vector workloads:
+  --storage heap|ao_column        blog_posts as heap, or append-optimized columnar with
+                                  compressed text columns and an uncompressed embedding
+                                  (genvec.py fills embeddings by UPDATE, which leaves every
+                                  old row behind on AO tables; it vacuums them afterwards)
+  --small-tables colocated|replicated
+                                  summaries/centroids distributed by cluster_id (co-located
+                                  with each other) or replicated to every segment
+  --cluster-index btree|bitmap|none
+                                  index on blog_cluster_assignments (version, cluster_id)
 """
+import argparse
 from config import EMBEDDING_DIMENSIONS
 
+# blog_posts storage: text columns are cold (only read for result rows) and compress
+# well; embeddings are scanned on every similarity query and barely compress, so
+# they are stored uncompressed to avoid paying decompression on each scan.
+POSTS_STORAGE = {
+    'heap': ('', ''),
+    'ao_column': (
+        ' ENCODING (compresstype=none)',
+        ' WITH (appendoptimized=true, orientation=column, compresstype=zstd, compresslevel=5)'
+    ),
+}
+
+SMALL_TABLE_DISTRIBUTION = {
+    'colocated': 'DISTRIBUTED BY (cluster_id)',
+    'replicated': 'DISTRIBUTED REPLICATED',
+}
+
+CLUSTER_INDEX = {
+    'btree': """
+--
+-- Name: blog_cluster_assignments_cluster_idx; Type: INDEX; Schema: public; Owner: gpadmin
+--
+
+CREATE INDEX blog_cluster_assignments_cluster_idx ON public.blog_cluster_assignments USING btree (version, cluster_id);
+
+""",
+    'bitmap': """
+--
+-- Name: blog_cluster_assignments_cluster_idx; Type: INDEX; Schema: public; Owner: gpadmin
+--
+
+CREATE INDEX blog_cluster_assignments_cluster_idx ON public.blog_cluster_assignments USING bitmap (version, cluster_id);
+
+""",
+    'none': '',
+}
+
 schema_template = """--
 -- Greenplum Database database dump
 --
@@ -33,14 +80,83 @@ SET default_table_access_method = heap;
 --
 
 CREATE TABLE public.blog_cluster_summaries (
+    version integer NOT NULL,
     cluster_id integer NOT NULL,
     summary text,
     generated_at timestamp without time zone DEFAULT now()
-) DISTRIBUTED BY (cluster_id);
+) {small_table_distribution};
 
 
 ALTER TABLE public.blog_cluster_summaries OWNER TO gpadmin;
 
+--
+-- Name: blog_cluster_centroids; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_centroids (
+    version integer NOT NULL,
+    cluster_id integer NOT NULL,
+    centroid public.vector({dimensions})
+) {small_table_distribution};
+
+
+ALTER TABLE public.blog_cluster_centroids OWNER TO gpadmin;
+
+--
+-- Name: blog_cluster_versions; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_versions (
+    version integer NOT NULL,
+    num_clusters integer,
+    created_at timestamp without time zone DEFAULT now(),
+    published_at timestamp without time zone
+) DISTRIBUTED BY (version);
+
+
+ALTER TABLE public.blog_cluster_versions OWNER TO gpadmin;
+
+--
+-- Name: blog_cluster_assignments; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_assignments (
+    version integer NOT NULL,
+    post_id integer NOT NULL,
+    cluster_id integer NOT NULL
+) DISTRIBUTED BY (post_id);
+
+
+ALTER TABLE public.blog_cluster_assignments OWNER TO gpadmin;
+
+--
+-- Name: blog_cluster_current; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_current (
+    version integer
+) DISTRIBUTED REPLICATED;
+
+
+ALTER TABLE public.blog_cluster_current OWNER TO gpadmin;
+
+INSERT INTO public.blog_cluster_current (version) VALUES (NULL);
+
+--
+-- Name: blog_cluster_version_seq; Type: SEQUENCE; Schema: public; Owner: gpadmin
+--
+
+CREATE SEQUENCE public.blog_cluster_version_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER TABLE public.blog_cluster_version_seq OWNER TO gpadmin;
+
 --
 -- Name: blog_posts; Type: TABLE; Schema: public; Owner: gpadmin
 --
@@ -51,9 +167,11 @@ CREATE TABLE public.blog_posts (
     title text,
     description text,
     is_verified boolean,
-    embedding public.vector({dimensions}),
-    cluster_id integer
-) DISTRIBUTED BY (id);
+    embedding public.vector({dimensions}){embedding_encoding},
+    search_tsv tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+    ) STORED
+){posts_storage} DISTRIBUTED BY (id);
 
 
 ALTER TABLE public.blog_posts OWNER TO gpadmin;
@@ -92,7 +210,31 @@ ALTER TABLE ONLY public.blog_posts ALTER COLUMN id SET DEFAULT nextval('public.b
 --
 
 ALTER TABLE ONLY public.blog_cluster_summaries
-    ADD CONSTRAINT blog_cluster_summaries_pkey PRIMARY KEY (cluster_id);
+    ADD CONSTRAINT blog_cluster_summaries_pkey PRIMARY KEY (version, cluster_id);
+
+
+--
+-- Name: blog_cluster_centroids blog_cluster_centroids_pkey; Type: CONSTRAINT; Schema: public; Owner: gpadmin
+--
+
+ALTER TABLE ONLY public.blog_cluster_centroids
+    ADD CONSTRAINT blog_cluster_centroids_pkey PRIMARY KEY (version, cluster_id);
+
+
+--
+-- Name: blog_cluster_versions blog_cluster_versions_pkey; Type: CONSTRAINT; Schema: public; Owner: gpadmin
+--
+
+ALTER TABLE ONLY public.blog_cluster_versions
+    ADD CONSTRAINT blog_cluster_versions_pkey PRIMARY KEY (version);
+
+
+--
+-- Name: blog_cluster_assignments blog_cluster_assignments_pkey; Type: CONSTRAINT; Schema: public; Owner: gpadmin
+--
+
+ALTER TABLE ONLY public.blog_cluster_assignments
+    ADD CONSTRAINT blog_cluster_assignments_pkey PRIMARY KEY (version, post_id);
 
 
 --
@@ -103,19 +245,69 @@ ALTER TABLE ONLY public.blog_posts
     ADD CONSTRAINT blog_posts_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: blog_posts_search_tsv_idx; Type: INDEX; Schema: public; Owner: gpadmin
+--
+
+CREATE INDEX blog_posts_search_tsv_idx ON public.blog_posts USING gin (search_tsv);
+
+{cluster_index}
+--
+-- Name: current_cluster_assignments; Type: VIEW; Schema: public; Owner: gpadmin
+--
+
+CREATE VIEW public.current_cluster_assignments AS
+ SELECT a.post_id,
+    a.cluster_id
+   FROM (public.blog_cluster_assignments a
+     JOIN public.blog_cluster_current c ON ((a.version = c.version)));
+
+
+ALTER TABLE public.current_cluster_assignments OWNER TO gpadmin;
+
+--
+-- Name: current_cluster_summaries; Type: VIEW; Schema: public; Owner: gpadmin
+--
+
+CREATE VIEW public.current_cluster_summaries AS
+ SELECT s.cluster_id,
+    s.summary,
+    s.generated_at
+   FROM (public.blog_cluster_summaries s
+     JOIN public.blog_cluster_current c ON ((s.version = c.version)));
+
+
+ALTER TABLE public.current_cluster_summaries OWNER TO gpadmin;
+
+
 --
 -- Greenplum Database database dump complete
 --
 """
 
-def generate_schema():
-    """Generate schema.sql with current embedding dimensions"""
-    schema = schema_template.replace('{dimensions}', str(EMBEDDING_DIMENSIONS))
+def generate_schema(storage='heap', small_tables='colocated', cluster_index='btree', output='schema.sql'):
+    """Generate schema.sql with current embedding dimensions and storage options"""
+    embedding_encoding, posts_storage = POSTS_STORAGE[storage]
+
+    schema = (schema_template
+              .replace('{dimensions}', str(EMBEDDING_DIMENSIONS))
+              .replace('{embedding_encoding}', embedding_encoding)
+              .replace('{posts_storage}', posts_storage)
+              .replace('{small_table_distribution}', SMALL_TABLE_DISTRIBUTION[small_tables])
+              .replace('{cluster_index}', CLUSTER_INDEX[cluster_index]))
 
-    with open('schema.sql', 'w') as f:
+    with open(output, 'w') as f:
         f.write(schema)
 
-    print(f"✅ Generated schema.sql with embedding dimensions: {EMBEDDING_DIMENSIONS}")
+    print(f"✅ Generated {output} with embedding dimensions: {EMBEDDING_DIMENSIONS}")
+    print(f"   blog_posts storage: {storage}, small tables: {small_tables}, cluster index: {cluster_index}")
 
 if __name__ == "__main__":
-    generate_schema()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate schema.sql for the blog recommendation database")
+    parser.add_argument('--storage', choices=sorted(POSTS_STORAGE), default='heap')
+    parser.add_argument('--small-tables', choices=sorted(SMALL_TABLE_DISTRIBUTION), default='colocated')
+    parser.add_argument('--cluster-index', choices=sorted(CLUSTER_INDEX), default='btree')
+    parser.add_argument('--output', default='schema.sql')
+    args = parser.parse_args()
+
+    generate_schema(args.storage, args.small_tables, args.cluster_index, args.output)
\ No newline at end of file
@@ -28,7 +28,24 @@ for row_id, title, desc in rows:
         (vec, row_id)
     )
 
+# --- COMPACT APPEND-OPTIMIZED STORAGE ---
+# Every UPDATE on an append-optimized table (generate_schema.py --storage ao_column)
+# leaves the old row version behind, so reclaim it once the batch is in.
+# The access method is read before committing: VACUUM needs autocommit, which
+# cannot be switched on inside an open transaction.
+cur.execute("""
+    SELECT am.amname FROM pg_class c JOIN pg_am am ON am.oid = c.relam
+    WHERE c.oid = 'blog_posts'::regclass;
+""")
+storage = cur.fetchone()
+
 conn.commit()
+
+if rows and storage and storage[0] in ('ao_row', 'ao_column'):
+    print(f"Vacuuming {storage[0]} blog_posts to reclaim {len(rows)} superseded rows")
+    conn.autocommit = True
+    cur.execute("VACUUM ANALYZE blog_posts;")
+
 cur.close()
 conn.close()
 print("✅ Embeddings populated.")
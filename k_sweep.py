@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Clustering-quality sweep for choosing the number of clusters.
+Runs KMeans for a range of k in parallel worker processes over a shared
+memory-mapped embedding matrix and reports inertia plus sampled silhouette
+and Davies-Bouldin scores. Read-only: cluster assignments and summaries are
+never touched.
+"""
+import os
+import sys
+import json
+import contextlib
+import argparse
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import psycopg2
+from pgvector.psycopg2 import register_vector
+# config prints its settings on import; keep them off stdout so --json stays parseable
+with contextlib.redirect_stdout(sys.stderr):
+    from config import get_connection_string
+
+# Per-worker state, populated once by the pool initializer
+_embeddings = None
+_sample = None
+
+
+def load_embeddings(path):
+    """Fetch all embeddings once and write them to a .npy file for memory-mapping"""
+    conn = psycopg2.connect(get_connection_string())
+    register_vector(conn)
+    cur = conn.cursor()
+    cur.execute("SELECT embedding FROM blog_posts WHERE embedding IS NOT NULL ORDER BY id")
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+
+    if not rows:
+        raise RuntimeError("No embeddings found - run genvec.py first")
+
+    matrix = np.lib.format.open_memmap(path, mode='w+', dtype=np.float32,
+                                       shape=(len(rows), len(rows[0][0])))
+    for i, (embedding,) in enumerate(rows):
+        matrix[i] = embedding
+    matrix.flush()
+    return matrix.shape
+
+
+def _init_worker(path, sample_size, seed):
+    global _embeddings, _sample
+    _embeddings = np.load(path, mmap_mode='r')
+    n = len(_embeddings)
+    rng = np.random.default_rng(seed)
+    _sample = np.sort(rng.choice(n, size=min(sample_size, n), replace=False))
+
+
+def evaluate_k(k, n_init, max_iter, seed):
+    """Fit KMeans for one k and score it; runs inside a worker process"""
+    from sklearn.cluster import KMeans
+    from sklearn.metrics import silhouette_score, davies_bouldin_score
+    from threadpoolctl import threadpool_limits
+
+    # One BLAS/OpenMP thread per worker so parallel fits don't oversubscribe cores
+    with threadpool_limits(limits=1):
+        kmeans = KMeans(n_clusters=k, max_iter=max_iter, n_init=n_init, random_state=seed)
+        labels = kmeans.fit_predict(_embeddings)
+
+        sample_x = np.asarray(_embeddings[_sample])
+        sample_labels = labels[_sample]
+        if len(np.unique(sample_labels)) > 1:
+            silhouette = float(silhouette_score(sample_x, sample_labels))
+            davies_bouldin = float(davies_bouldin_score(sample_x, sample_labels))
+        else:
+            silhouette = davies_bouldin = None
+
+    sizes = np.bincount(labels, minlength=k)
+    return {
+        'k': k,
+        'inertia': float(kmeans.inertia_),
+        'silhouette': silhouette,
+        'davies_bouldin': davies_bouldin,
+        'min_cluster_size': int(sizes.min()),
+        'max_cluster_size': int(sizes.max()),
+        'iterations': int(kmeans.n_iter_)
+    }
+
+
+def sweep(path, ks, workers=None, sample_size=2000, n_init=10, max_iter=100, seed=42):
+    """Evaluate every k in one parallel pass over the memory-mapped matrix"""
+    results = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(path, sample_size, seed)) as pool:
+        futures = [pool.submit(evaluate_k, k, n_init, max_iter, seed) for k in ks]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            print(f"  k={result['k']:>3} done", file=sys.stderr)
+    return sorted(results, key=lambda row: row['k'])
+
+
+def format_table(results):
+    """Render sweep results as a plain-text table"""
+    def fmt(value):
+        return f"{value:.4f}" if value is not None else 'n/a'
+
+    lines = [f"{'k':>4}  {'inertia':>14}  {'silhouette':>10}  {'davies_bouldin':>14}  {'min_size':>8}  {'max_size':>8}"]
+    for row in results:
+        lines.append(
+            f"{row['k']:>4}  {row['inertia']:>14.2f}  {fmt(row['silhouette']):>10}  "
+            f"{fmt(row['davies_bouldin']):>14}  {row['min_cluster_size']:>8}  {row['max_cluster_size']:>8}"
+        )
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate KMeans quality for a range of cluster counts")
+    parser.add_argument('--k-min', type=int, default=2)
+    parser.add_argument('--k-max', type=int, default=50)
+    parser.add_argument('--step', type=int, default=1)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--sample-size', type=int, default=2000,
+                        help='Points sampled for silhouette / Davies-Bouldin scoring')
+    parser.add_argument('--n-init', type=int, default=10)
+    parser.add_argument('--max-iter', type=int, default=100)
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    args = parser.parse_args()
+
+    if args.k_min < 2 or args.k_max < args.k_min:
+        parser.error('require 2 <= k-min <= k-max')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'embeddings.npy')
+        n, dims = load_embeddings(path)
+        ks = list(range(args.k_min, args.k_max + 1, args.step))
+        print(f"Sweeping k={ks[0]}..{ks[-1]} over {n} x {dims} embeddings with {args.workers} workers",
+              file=sys.stderr)
+        results = sweep(path, ks, args.workers, args.sample_size, args.n_init, args.max_iter)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(format_table(results))
+
+
+if __name__ == "__main__":
+    main()
@@ -328,7 +328,7 @@ psql -h $GP_HOST -p $GP_PORT -U $GP_USER -d $DB_NAME << 'EOF'
 \set ON_ERROR_STOP on
 
 -- Insert data from staging into blog_posts with data cleaning
-INSERT INTO blog_posts (id, category, title, description, is_verified, cluster_id)
+INSERT INTO blog_posts (id, category, title, description, is_verified)
 SELECT
     CASE
         WHEN id ~ '^[0-9]+$' THEN id::integer
@@ -337,8 +337,7 @@ SELECT
     publication as category,
     title,
     COALESCE(subtitle, '') as description,
-    false as is_verified,
-    NULL as cluster_id
+    false as is_verified
 FROM staging_posts
 WHERE id ~ '^[0-9]+$'  -- Only include rows with valid integer IDs
 AND id IS NOT NULL
@@ -0,0 +1,142 @@
+"""
+Lightweight latency and throughput instrumentation for the web application.
+Records per-route request histograms and per-stage timing spans (DB connect,
+individual queries, NumPy work, model calls) and renders them in the
+Prometheus text exposition format. Optionally emits a Server-Timing header.
+"""
+import time
+import threading
+from bisect import bisect_left
+from contextlib import nullcontext
+from flask import g, request
+from config import METRICS_ENABLED, SERVER_TIMING_ENABLED
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Shared no-op context returned by span() when instrumentation is disabled
+_NOOP_SPAN = nullcontext()
+
+_lock = threading.Lock()
+_request_latency = {}
+_stage_latency = {}
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (cumulative counts computed on render)"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.total += value
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+
+
+class _Span:
+    """Times a block of work and attaches it to the current request"""
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        spans = g.get('metric_spans')
+        if spans is not None:
+            spans.append((self.name, elapsed))
+        return False
+
+
+def span(name):
+    """Context manager timing one stage of the current request"""
+    if not METRICS_ENABLED:
+        return _NOOP_SPAN
+    return _Span(name)
+
+
+def _observe(table, key, value):
+    with _lock:
+        histogram = table.get(key)
+        if histogram is None:
+            histogram = table[key] = Histogram()
+        histogram.observe(value)
+
+
+def _before_request():
+    g.metric_start = time.perf_counter()
+    g.metric_spans = []
+
+
+def _after_request(response):
+    start = g.get('metric_start')
+    if start is None:
+        return response
+
+    elapsed = time.perf_counter() - start
+    route = request.url_rule.rule if request.url_rule else 'unmatched'
+    spans = g.get('metric_spans', [])
+
+    _observe(_request_latency, (route, request.method, str(response.status_code)), elapsed)
+    for name, duration in spans:
+        _observe(_stage_latency, (route, name), duration)
+
+    if SERVER_TIMING_ENABLED:
+        # One entry per stage: spans repeated in a loop (per cluster, per model call) are summed
+        totals = {}
+        for name, duration in spans:
+            totals[name] = totals.get(name, 0.0) + duration
+        entries = [f"{name};dur={duration * 1000:.2f}" for name, duration in totals.items()]
+        entries.append(f"total;dur={elapsed * 1000:.2f}")
+        response.headers['Server-Timing'] = ', '.join(entries)
+
+    return response
+
+
+def init_app(app):
+    """Register request hooks when instrumentation is enabled"""
+    if not METRICS_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _render_histogram(lines, name, help_text, table, label_names):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, histogram in sorted(table.items()):
+        labels = ','.join(f'{label}="{_escape(value)}"' for label, value in zip(label_names, key))
+        cumulative = 0
+        for bound, count in zip(histogram.buckets, histogram.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        lines.append(f'{name}_sum{{{labels}}} {histogram.total:.6f}')
+        lines.append(f'{name}_count{{{labels}}} {histogram.count}')
+
+
+def render():
+    """Render all collected metrics in the Prometheus text format"""
+    lines = []
+    with _lock:
+        _render_histogram(lines, 'blogrec_request_duration_seconds',
+                          'Request latency by route, method and status.',
+                          _request_latency, ('route', 'method', 'status'))
+        _render_histogram(lines, 'blogrec_stage_duration_seconds',
+                          'Latency of individual request stages (queries, NumPy, model calls).',
+                          _stage_latency, ('route', 'stage'))
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,32 @@
+-- Add materialized cluster centroids and the assignment index to an existing database
+-- Usage: psql -f migrate_cluster_centroids.sql demo   (after migrate_cluster_versions.sql)
+--
+-- New databases created from schema.sql already have this layout.
+
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+CREATE TABLE public.blog_cluster_centroids (
+    version integer NOT NULL,
+    cluster_id integer NOT NULL,
+    centroid public.vector,
+    PRIMARY KEY (version, cluster_id)
+) DISTRIBUTED BY (cluster_id);
+
+-- Backfill the published version
+INSERT INTO public.blog_cluster_centroids (version, cluster_id, centroid)
+SELECT a.version, a.cluster_id, AVG(b.embedding)
+FROM public.blog_cluster_assignments a
+JOIN public.blog_cluster_current c ON c.version = a.version
+JOIN public.blog_posts b ON b.id = a.post_id
+WHERE b.embedding IS NOT NULL
+GROUP BY a.version, a.cluster_id;
+
+CREATE INDEX blog_cluster_assignments_cluster_idx
+    ON public.blog_cluster_assignments USING btree (version, cluster_id);
+
+COMMIT;
+
+ANALYZE public.blog_cluster_centroids;
+ANALYZE public.blog_cluster_assignments;
@@ -0,0 +1,63 @@
+-- Migrate an existing database from blog_posts.cluster_id to versioned cluster assignments
+-- Usage: psql -f migrate_cluster_versions.sql demo
+--
+-- The current assignments and summaries become version 1 and are published.
+-- New databases created from schema.sql already have this layout.
+
+\set ON_ERROR_STOP on
+
+BEGIN;
+
+CREATE TABLE public.blog_cluster_versions (
+    version integer NOT NULL PRIMARY KEY,
+    num_clusters integer,
+    created_at timestamp without time zone DEFAULT now(),
+    published_at timestamp without time zone
+) DISTRIBUTED BY (version);
+
+CREATE TABLE public.blog_cluster_assignments (
+    version integer NOT NULL,
+    post_id integer NOT NULL,
+    cluster_id integer NOT NULL,
+    PRIMARY KEY (version, post_id)
+) DISTRIBUTED BY (post_id);
+
+CREATE TABLE public.blog_cluster_current (
+    version integer
+) DISTRIBUTED REPLICATED;
+
+CREATE SEQUENCE public.blog_cluster_version_seq AS integer START WITH 2 CACHE 1;
+
+-- Existing clustering becomes version 1
+INSERT INTO public.blog_cluster_versions (version, num_clusters, published_at)
+SELECT 1, COUNT(DISTINCT cluster_id), now() FROM public.blog_posts WHERE cluster_id IS NOT NULL;
+
+INSERT INTO public.blog_cluster_assignments (version, post_id, cluster_id)
+SELECT 1, id, cluster_id FROM public.blog_posts WHERE cluster_id IS NOT NULL;
+
+-- Summaries are keyed by (version, cluster_id)
+ALTER TABLE public.blog_cluster_summaries ADD COLUMN version integer;
+UPDATE public.blog_cluster_summaries SET version = 1;
+ALTER TABLE public.blog_cluster_summaries ALTER COLUMN version SET NOT NULL;
+ALTER TABLE public.blog_cluster_summaries DROP CONSTRAINT blog_cluster_summaries_pkey;
+ALTER TABLE public.blog_cluster_summaries
+    ADD CONSTRAINT blog_cluster_summaries_pkey PRIMARY KEY (version, cluster_id);
+
+INSERT INTO public.blog_cluster_current (version) VALUES (1);
+
+CREATE VIEW public.current_cluster_assignments AS
+ SELECT a.post_id,
+    a.cluster_id
+   FROM (public.blog_cluster_assignments a
+     JOIN public.blog_cluster_current c ON ((a.version = c.version)));
+
+CREATE VIEW public.current_cluster_summaries AS
+ SELECT s.cluster_id,
+    s.summary,
+    s.generated_at
+   FROM (public.blog_cluster_summaries s
+     JOIN public.blog_cluster_current c ON ((s.version = c.version)));
+
+ALTER TABLE public.blog_posts DROP COLUMN cluster_id;
+
+COMMIT;
@@ -0,0 +1,124 @@
+"""
+Opt-in SQL diagnostics for the web application.
+Provides a psycopg2 cursor that times every statement, logs statements slower
+than a threshold together with a sampled EXPLAIN (ANALYZE, BUFFERS) plan, and
+keeps an aggregated per-statement report so regressions can be traced to a
+specific query as the corpus grows.
+"""
+import re
+import time
+import random
+import hashlib
+import threading
+import psycopg2.extensions
+from config import SLOW_QUERY_MS, EXPLAIN_SAMPLE_RATE
+
+_lock = threading.Lock()
+_statements = {}
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def _normalize(query):
+    """Collapse whitespace so the same inline SQL always maps to one entry"""
+    if isinstance(query, bytes):
+        query = query.decode('utf-8', 'replace')
+    return _WHITESPACE.sub(' ', str(query)).strip()
+
+
+def _fingerprint(statement):
+    return hashlib.md5(statement.encode('utf-8')).hexdigest()[:12]
+
+
+def _record(statement, elapsed_ms, plan):
+    with _lock:
+        entry = _statements.get(statement)
+        if entry is None:
+            entry = _statements[statement] = {
+                'id': _fingerprint(statement),
+                'statement': statement,
+                'calls': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'slow_calls': 0,
+                'last_plan': None,
+            }
+        entry['calls'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        if elapsed_ms >= SLOW_QUERY_MS:
+            entry['slow_calls'] += 1
+        if plan is not None:
+            entry['last_plan'] = plan
+
+
+class DiagnosticCursor(psycopg2.extensions.cursor):
+    """Cursor that times statements and samples plans for slow ones"""
+
+    def execute(self, query, vars=None):
+        start = time.perf_counter()
+        succeeded = False
+        try:
+            result = super().execute(query, vars)
+            succeeded = True
+            return result
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            statement = _normalize(query)
+            plan = None
+            if elapsed_ms >= SLOW_QUERY_MS:
+                # A failed statement has aborted the transaction; there is nothing to explain
+                if succeeded and random.random() < EXPLAIN_SAMPLE_RATE:
+                    plan = self._explain(query, vars)
+                print(f"[slow-query] {elapsed_ms:.1f} ms ({_fingerprint(statement)}): {statement[:200]}")
+                if plan:
+                    print('\n'.join(f"    {line}" for line in plan))
+            _record(statement, elapsed_ms, plan)
+
+    def _explain(self, query, vars):
+        """Run EXPLAIN for a statement on a side cursor, isolated by a savepoint.
+
+        Only read-only SELECT/WITH ... SELECT statements are re-executed with
+        ANALYZE; anything that writes is explained without running it.
+        """
+        conn = self.connection
+        if conn.closed or conn.status != psycopg2.extensions.STATUS_IN_TRANSACTION:
+            return None
+
+        text = query.decode('utf-8', 'replace') if isinstance(query, bytes) else query
+        leading = text.lstrip().split(None, 1)[0].upper() if text.strip() else ''
+        writes = re.search(r'\b(UPDATE|DELETE|INSERT)\b', text, re.IGNORECASE)
+        options = 'ANALYZE, BUFFERS' if leading in ('SELECT', 'WITH') and not writes else 'COSTS'
+
+        side = conn.cursor(cursor_factory=psycopg2.extensions.cursor)
+        try:
+            side.execute("SAVEPOINT query_diagnostics")
+            try:
+                side.execute(f"EXPLAIN ({options}) {text}", vars)
+                plan = [row[0] for row in side.fetchall()]
+            except Exception as e:
+                plan = [f"EXPLAIN failed: {e}"]
+            side.execute("ROLLBACK TO SAVEPOINT query_diagnostics")
+            return plan
+        except Exception as e:
+            print(f"[slow-query] Could not explain statement: {e}")
+            return None
+        finally:
+            side.close()
+
+
+def report():
+    """Aggregated per-statement report, slowest total time first"""
+    with _lock:
+        entries = [dict(entry) for entry in _statements.values()]
+
+    for entry in entries:
+        entry['mean_ms'] = entry['total_ms'] / entry['calls'] if entry['calls'] else 0.0
+    entries.sort(key=lambda entry: entry['total_ms'], reverse=True)
+    return entries
+
+
+def reset():
+    """Drop all aggregated statement statistics"""
+    with _lock:
+        _statements.clear()
@@ -0,0 +1,100 @@
+"""
+Fusion and diversity-aware reranking of nearest-neighbour candidate sets.
+The reranking strategies take candidates already ordered by relevance and
+return the indices of the k rows to show, so callers can rerank any result set.
+"""
+import numpy as np
+
+RERANK_STRATEGIES = ('mmr', 'cluster_quota')
+
+# Standard reciprocal rank fusion damping constant
+RRF_K = 60
+
+
+def weighted_rank_fusion(ranked_lists, weights, key=lambda row: row[0], rrf_k=RRF_K):
+    """Merge ranked lists with weighted reciprocal rank fusion.
+
+    Each item scores sum(weight / (rrf_k + rank)) over the lists it appears
+    in; items are deduplicated by key. Returns (items, scores) ordered by
+    descending fused score.
+    """
+    scores = {}
+    items = {}
+    for ranked, weight in zip(ranked_lists, weights):
+        for rank, item in enumerate(ranked, start=1):
+            item_key = key(item)
+            scores[item_key] = scores.get(item_key, 0.0) + weight / (rrf_k + rank)
+            items.setdefault(item_key, item)
+
+    order = sorted(scores, key=scores.get, reverse=True)
+    return [items[item_key] for item_key in order], np.array([scores[item_key] for item_key in order])
+
+
+def mmr(query_vec, candidate_vecs, k, lambda_=0.7, relevance=None):
+    """Maximal Marginal Relevance over candidate embeddings.
+
+    Greedily picks the candidate maximising
+    lambda * sim(query, c) - (1 - lambda) * max(sim(c, selected)),
+    using cosine similarity. Similarity to the selected set is maintained
+    incrementally, so each step is a single matrix-vector product.
+    A precomputed relevance array (scaled to [0, 1]) may be passed instead
+    of a query vector, e.g. fused scores from multi-vector retrieval.
+    """
+    candidates = np.asarray(candidate_vecs, dtype=np.float32)
+    n = len(candidates)
+    k = min(k, n)
+    if k == 0:
+        return []
+
+    norms = np.linalg.norm(candidates, axis=1, keepdims=True)
+    candidates = candidates / np.maximum(norms, 1e-12)
+    if relevance is None:
+        query = np.asarray(query_vec, dtype=np.float32)
+        query = query / max(np.linalg.norm(query), 1e-12)
+        relevance = candidates @ query
+    else:
+        relevance = np.asarray(relevance, dtype=np.float32)
+
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected = []
+
+    for step in range(k):
+        if step == 0:
+            scores = relevance.copy()
+        else:
+            scores = lambda_ * relevance - (1.0 - lambda_) * redundancy
+        scores[~available] = -np.inf
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, candidates @ candidates[best], out=redundancy)
+
+    return selected
+
+
+def cluster_quota(cluster_ids, k, max_per_cluster):
+    """Keep relevance order but cap how many results any one cluster contributes.
+
+    If the quota leaves fewer than k results, the remaining slots are filled
+    with the best skipped candidates.
+    """
+    k = min(k, len(cluster_ids))
+    counts = {}
+    selected = []
+    skipped = []
+
+    for index, cluster_id in enumerate(cluster_ids):
+        if len(selected) == k:
+            break
+        if counts.get(cluster_id, 0) < max_per_cluster:
+            counts[cluster_id] = counts.get(cluster_id, 0) + 1
+            selected.append(index)
+        else:
+            skipped.append(index)
+
+    if len(selected) < k:
+        selected.extend(skipped[:k - len(selected)])
+        selected.sort()
+
+    return selected
@@ -50,9 +50,9 @@ else
     exit 1
 fi
 
-# Check if clustering is done
+# Check if clustering is done (the newest version may still be staged until summarize.py publishes it)
 echo -n "🎯 Clustering completed: "
-CLUSTER_COUNT=$(python3 -c "import sys; sys.stdout = open('/dev/null', 'w'); from config import *; sys.stdout = sys.__stdout__; import psycopg2; conn=psycopg2.connect(get_connection_string()); cur=conn.cursor(); cur.execute('SELECT COUNT(*) FROM blog_posts WHERE cluster_id IS NOT NULL'); print(cur.fetchone()[0]); conn.close()" 2>/dev/null)
+CLUSTER_COUNT=$(python3 -c "import sys; sys.stdout = open('/dev/null', 'w'); from config import *; sys.stdout = sys.__stdout__; import psycopg2; conn=psycopg2.connect(get_connection_string()); cur=conn.cursor(); cur.execute('SELECT COUNT(*) FROM blog_cluster_assignments WHERE version = (SELECT MAX(version) FROM blog_cluster_versions)'); print(cur.fetchone()[0]); conn.close()" 2>/dev/null)
 if [ "$CLUSTER_COUNT" -gt 0 ]; then
     echo "✅ $CLUSTER_COUNT posts clustered"
 else
@@ -63,7 +63,7 @@ fi
 
 # Check if summaries exist
 echo -n "📝 Cluster summaries: "
-SUMMARY_COUNT=$(python3 -c "import sys; sys.stdout = open('/dev/null', 'w'); from config import *; sys.stdout = sys.__stdout__; import psycopg2; conn=psycopg2.connect(get_connection_string()); cur=conn.cursor(); cur.execute('SELECT COUNT(*) FROM blog_cluster_summaries'); print(cur.fetchone()[0]); conn.close()" 2>/dev/null)
+SUMMARY_COUNT=$(python3 -c "import sys; sys.stdout = open('/dev/null', 'w'); from config import *; sys.stdout = sys.__stdout__; import psycopg2; conn=psycopg2.connect(get_connection_string()); cur=conn.cursor(); cur.execute('SELECT COUNT(*) FROM current_cluster_summaries'); print(cur.fetchone()[0]); conn.close()" 2>/dev/null)
 if [ "$SUMMARY_COUNT" -gt 0 ]; then
     echo "✅ $SUMMARY_COUNT summaries"
 else
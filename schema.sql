@@ -27,6 +27,7 @@ SET default_table_access_method = heap;
 --
 
 CREATE TABLE public.blog_cluster_summaries (
+    version integer NOT NULL,
     cluster_id integer NOT NULL,
     summary text,
     generated_at timestamp without time zone DEFAULT now()
@@ -35,6 +36,74 @@ CREATE TABLE public.blog_cluster_summaries (
 
 ALTER TABLE public.blog_cluster_summaries OWNER TO gpadmin;
 
+--
+-- Name: blog_cluster_centroids; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_centroids (
+    version integer NOT NULL,
+    cluster_id integer NOT NULL,
+    centroid public.vector(768)
+) DISTRIBUTED BY (cluster_id);
+
+
+ALTER TABLE public.blog_cluster_centroids OWNER TO gpadmin;
+
+--
+-- Name: blog_cluster_versions; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_versions (
+    version integer NOT NULL,
+    num_clusters integer,
+    created_at timestamp without time zone DEFAULT now(),
+    published_at timestamp without time zone
+) DISTRIBUTED BY (version);
+
+
+ALTER TABLE public.blog_cluster_versions OWNER TO gpadmin;
+
+--
+-- Name: blog_cluster_assignments; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_assignments (
+    version integer NOT NULL,
+    post_id integer NOT NULL,
+    cluster_id integer NOT NULL
+) DISTRIBUTED BY (post_id);
+
+
+ALTER TABLE public.blog_cluster_assignments OWNER TO gpadmin;
+
+--
+-- Name: blog_cluster_current; Type: TABLE; Schema: public; Owner: gpadmin
+--
+
+CREATE TABLE public.blog_cluster_current (
+    version integer
+) DISTRIBUTED REPLICATED;
+
+
+ALTER TABLE public.blog_cluster_current OWNER TO gpadmin;
+
+INSERT INTO public.blog_cluster_current (version) VALUES (NULL);
+
+--
+-- Name: blog_cluster_version_seq; Type: SEQUENCE; Schema: public; Owner: gpadmin
+--
+
+CREATE SEQUENCE public.blog_cluster_version_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER TABLE public.blog_cluster_version_seq OWNER TO gpadmin;
+
 --
 -- Name: blog_posts; Type: TABLE; Schema: public; Owner: gpadmin
 --
@@ -46,7 +115,9 @@ CREATE TABLE public.blog_posts (
     description text,
     is_verified boolean,
     embedding public.vector(768),
-    cluster_id integer
+    search_tsv tsvector GENERATED ALWAYS AS (
+        to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))
+    ) STORED
 ) DISTRIBUTED BY (id);
 
 
@@ -86,7 +157,31 @@ ALTER TABLE ONLY public.blog_posts ALTER COLUMN id SET DEFAULT nextval('public.b
 --
 
 ALTER TABLE ONLY public.blog_cluster_summaries
-    ADD CONSTRAINT blog_cluster_summaries_pkey PRIMARY KEY (cluster_id);
+    ADD CONSTRAINT blog_cluster_summaries_pkey PRIMARY KEY (version, cluster_id);
+
+
+--
+-- Name: blog_cluster_centroids blog_cluster_centroids_pkey; Type: CONSTRAINT; Schema: public; Owner: gpadmin
+--
+
+ALTER TABLE ONLY public.blog_cluster_centroids
+    ADD CONSTRAINT blog_cluster_centroids_pkey PRIMARY KEY (version, cluster_id);
+
+
+--
+-- Name: blog_cluster_versions blog_cluster_versions_pkey; Type: CONSTRAINT; Schema: public; Owner: gpadmin
+--
+
+ALTER TABLE ONLY public.blog_cluster_versions
+    ADD CONSTRAINT blog_cluster_versions_pkey PRIMARY KEY (version);
+
+
+--
+-- Name: blog_cluster_assignments blog_cluster_assignments_pkey; Type: CONSTRAINT; Schema: public; Owner: gpadmin
+--
+
+ALTER TABLE ONLY public.blog_cluster_assignments
+    ADD CONSTRAINT blog_cluster_assignments_pkey PRIMARY KEY (version, post_id);
 
 
 --
@@ -97,6 +192,48 @@ ALTER TABLE ONLY public.blog_posts
     ADD CONSTRAINT blog_posts_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: blog_posts_search_tsv_idx; Type: INDEX; Schema: public; Owner: gpadmin
+--
+
+CREATE INDEX blog_posts_search_tsv_idx ON public.blog_posts USING gin (search_tsv);
+
+
+--
+-- Name: blog_cluster_assignments_cluster_idx; Type: INDEX; Schema: public; Owner: gpadmin
+--
+
+CREATE INDEX blog_cluster_assignments_cluster_idx ON public.blog_cluster_assignments USING btree (version, cluster_id);
+
+
+--
+-- Name: current_cluster_assignments; Type: VIEW; Schema: public; Owner: gpadmin
+--
+
+CREATE VIEW public.current_cluster_assignments AS
+ SELECT a.post_id,
+    a.cluster_id
+   FROM (public.blog_cluster_assignments a
+     JOIN public.blog_cluster_current c ON ((a.version = c.version)));
+
+
+ALTER TABLE public.current_cluster_assignments OWNER TO gpadmin;
+
+--
+-- Name: current_cluster_summaries; Type: VIEW; Schema: public; Owner: gpadmin
+--
+
+CREATE VIEW public.current_cluster_summaries AS
+ SELECT s.cluster_id,
+    s.summary,
+    s.generated_at
+   FROM (public.blog_cluster_summaries s
+     JOIN public.blog_cluster_current c ON ((s.version = c.version)));
+
+
+ALTER TABLE public.current_cluster_summaries OWNER TO gpadmin;
+
+
 --
 -- Greenplum Database database dump complete
 --
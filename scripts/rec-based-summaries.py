@@ -11,13 +11,13 @@ cur = conn.cursor()
 
 # Step 1: Fetch cluster summaries and representative vectors
 cur.execute("""
-    SELECT c.cluster_id, s.summary, AVG(b.embedding)::vector
-    FROM blog_cluster_summaries s
-    JOIN blog_posts b ON b.cluster_id = s.cluster_id
-    JOIN (SELECT DISTINCT cluster_id FROM blog_cluster_summaries) c ON c.cluster_id = s.cluster_id
+    SELECT s.cluster_id, s.summary, AVG(b.embedding)::vector
+    FROM current_cluster_summaries s
+    JOIN current_cluster_assignments a ON a.cluster_id = s.cluster_id
+    JOIN blog_posts b ON b.id = a.post_id
     WHERE b.embedding IS NOT NULL
-    GROUP BY c.cluster_id, s.summary
-    ORDER BY c.cluster_id;
+    GROUP BY s.cluster_id, s.summary
+    ORDER BY s.cluster_id;
 """)
 clusters = cur.fetchall()
 
@@ -31,10 +31,11 @@ for cluster_id, summary, emb in clusters:
 
     # Print 5 sample titles from this cluster
     cur.execute("""
-        SELECT title
-        FROM blog_posts
-        WHERE cluster_id = %s
-          AND embedding IS NOT NULL
+        SELECT b.title
+        FROM current_cluster_assignments a
+        JOIN blog_posts b ON b.id = a.post_id
+        WHERE a.cluster_id = %s
+          AND b.embedding IS NOT NULL
         LIMIT 5;
     """, (cluster_id,))
     samples = cur.fetchall()
@@ -58,10 +59,11 @@ pref_vec = Vector(preference_vec.tolist())
 
 # Step 4a: Query 25 most similar articles
 cur.execute("""
-    SELECT id, title, description, cluster_id
-    FROM blog_posts
-    WHERE embedding IS NOT NULL
-    ORDER BY embedding <-> %s ASC
+    SELECT b.id, b.title, b.description, a.cluster_id
+    FROM blog_posts b
+    LEFT JOIN current_cluster_assignments a ON a.post_id = b.id
+    WHERE b.embedding IS NOT NULL
+    ORDER BY b.embedding <-> %s ASC
     LIMIT 25;
 """, (pref_vec,))
 
@@ -71,10 +73,11 @@ for row in cur.fetchall():
 
 # Step 4b: Query 25 least similar articles
 cur.execute("""
-    SELECT id, title, description, cluster_id
-    FROM blog_posts
-    WHERE embedding IS NOT NULL
-    ORDER BY embedding <-> %s DESC
+    SELECT b.id, b.title, b.description, a.cluster_id
+    FROM blog_posts b
+    LEFT JOIN current_cluster_assignments a ON a.post_id = b.id
+    WHERE b.embedding IS NOT NULL
+    ORDER BY b.embedding <-> %s DESC
     LIMIT 25;
 """, (pref_vec,))
 
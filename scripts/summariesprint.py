@@ -8,7 +8,7 @@ cur = conn.cursor()
 # 1. Get all cluster summaries ordered by cluster_id
 cur.execute("""
     SELECT cluster_id, summary
-    FROM blog_cluster_summaries
+    FROM current_cluster_summaries
     ORDER BY cluster_id;
 """)
 clusters = cur.fetchall()
@@ -21,9 +21,10 @@ for cid, summary in clusters:
 
     # 2. Fetch 5 random samples from this cluster
     cur.execute("""
-        SELECT title, description
-        FROM blog_posts
-        WHERE cluster_id = %s
+        SELECT b.title, b.description
+        FROM current_cluster_assignments a
+        JOIN blog_posts b ON b.id = a.post_id
+        WHERE a.cluster_id = %s
         ORDER BY random()
         LIMIT 5;
     """, (cid,))
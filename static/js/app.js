@@ -239,6 +239,8 @@ class RecommendationApp {
 
             if (summariesResult.error) {
                 console.warn('⚠️ Summaries generation failed:', summariesResult.error);
+            } else if (!summariesResult.published) {
+                console.warn('⚠️ New clustering not published (summaries incomplete):', summariesResult);
             } else {
                 console.log('✅ Summaries generated:', summariesResult);
             }
@@ -1,6 +1,7 @@
 import psycopg2
 from datetime import datetime
 from config import *
+import cluster_versions
 
 # --- OpenAI CLIENT ---
 client = get_openai_client()
@@ -9,8 +10,12 @@ client = get_openai_client()
 conn = psycopg2.connect(get_connection_string())
 cur = conn.cursor()
 
-# 1. Get cluster IDs
-cur.execute("SELECT DISTINCT cluster_id FROM blog_posts WHERE cluster_id IS NOT NULL;")
+# 1. Get cluster IDs of the newest clustering version
+version = cluster_versions.latest_version(cur)
+if version is None:
+    raise SystemExit("No clustering found - run cluster.sql first")
+
+cur.execute("SELECT DISTINCT cluster_id FROM blog_cluster_assignments WHERE version = %s;", (version,))
 cluster_ids = [r[0] for r in cur.fetchall()]
 
 for cid in cluster_ids:
@@ -19,13 +24,14 @@ for cid in cluster_ids:
     # 2. Fetch 40 sample titles+descriptions
     cur.execute(f"""
         WITH ranked AS (
-            SELECT title, description,
+            SELECT b.title, b.description,
                    ROW_NUMBER() OVER (ORDER BY random()) AS rn
-            FROM blog_posts
-            WHERE cluster_id = %s
+            FROM blog_cluster_assignments a
+            JOIN blog_posts b ON b.id = a.post_id
+            WHERE a.version = %s AND a.cluster_id = %s
         )
         SELECT title, description FROM ranked WHERE rn <= %s;
-    """, (cid, CLUSTER_SAMPLE_SIZE))
+    """, (version, cid, CLUSTER_SAMPLE_SIZE))
     rows = cur.fetchall()
 
     # Build text block
@@ -48,15 +54,21 @@ for cid in cluster_ids:
 
     # 4. Insert into summaries table
     cur.execute("""
-        INSERT INTO blog_cluster_summaries (cluster_id, summary, generated_at)
-        VALUES (%s, %s, %s)
-        ON CONFLICT (cluster_id) DO UPDATE SET
+        INSERT INTO blog_cluster_summaries (version, cluster_id, summary, generated_at)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (version, cluster_id) DO UPDATE SET
             summary = EXCLUDED.summary,
             generated_at = EXCLUDED.generated_at;
-    """, (cid, summary, datetime.now()))
+    """, (version, cid, summary, datetime.now()))
 
     conn.commit()
     print(f"Cluster {cid} summary saved.")
 
+# 5. Publish the version now that every cluster has a summary, and drop old versions
+cluster_versions.publish_version(cur, version)
+removed = cluster_versions.garbage_collect(cur)
+conn.commit()
+print(f"Published clustering version {version} ({removed} old versions removed).")
+
 cur.close()
 conn.close()
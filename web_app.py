@@ -3,24 +3,151 @@
 Modern Flask web application for the Blog Recommendation Engine.
 Provides a sleek UI for the Greenplum + AI recommendation demo.
 """
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, request, jsonify, render_template, Response
 from flask_cors import CORS
 import psycopg2
 import numpy as np
 from pgvector.psycopg2 import register_vector
 from pgvector import Vector
 import json
+import math
+from functools import lru_cache
 from config import *
+import metrics
+import query_diagnostics
+import cluster_versions
+from metrics import span
+from reranking import RERANK_STRATEGIES, mmr, cluster_quota, weighted_rank_fusion
 
 app = Flask(__name__)
 CORS(app)
+metrics.init_app(app)
 
 def get_db_connection():
     """Get database connection with pgvector support"""
-    conn = psycopg2.connect(get_connection_string())
-    register_vector(conn)
+    with span('db_connect'):
+        if QUERY_DIAGNOSTICS_ENABLED:
+            conn = psycopg2.connect(get_connection_string(),
+                                    cursor_factory=query_diagnostics.DiagnosticCursor)
+        else:
+            conn = psycopg2.connect(get_connection_string())
+        register_vector(conn)
     return conn
 
+# Candidate posts for each rated centroid (centroid_idx, post_id): members of
+# the nearest probed clusters, or every post for an exact scan
+PROBED_CANDIDATES = """
+    probes AS (
+        SELECT centroid_idx, cluster_id, centroid
+        FROM (
+            SELECT r.centroid_idx, o.cluster_id, c.centroid,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY r.centroid_idx ORDER BY o.centroid <-> c.centroid
+                   ) AS probe_rank
+            FROM rated r
+            JOIN blog_cluster_centroids c ON c.version = %(version)s AND c.cluster_id = r.cluster_id
+            JOIN blog_cluster_centroids o ON o.version = c.version
+        ) p
+        WHERE probe_rank <= %(probes)s
+    ),
+    scored AS (
+        SELECT pr.centroid_idx, p.id, p.embedding <-> pr.centroid AS distance
+        FROM probes pr
+        JOIN blog_cluster_assignments a ON a.version = %(version)s AND a.cluster_id = pr.cluster_id
+        JOIN blog_posts p ON p.id = a.post_id
+        WHERE p.embedding IS NOT NULL
+    )"""
+
+EXACT_CANDIDATES = """
+    scored AS (
+        SELECT r.centroid_idx, p.id, p.embedding <-> c.centroid AS distance
+        FROM rated r
+        JOIN blog_cluster_centroids c ON c.version = %(version)s AND c.cluster_id = r.cluster_id
+        CROSS JOIN blog_posts p
+        WHERE p.embedding IS NOT NULL
+    )"""
+
+
+def nearest_per_centroid(cur, version, rated, per_centroid, candidates, with_embeddings=False):
+    """Top `per_centroid` posts nearest to each rated cluster's centroid.
+
+    `rated` maps centroid index to cluster id. Only (centroid, id, distance)
+    goes through the window sort; post columns are joined in for the
+    surviving rows alone. Returns {centroid_idx: [row, ...]} in rank order.
+    """
+    values = ', '.join(
+        cur.mogrify('(%s, %s)', (idx, cluster_id)).decode() for idx, cluster_id in rated.items()
+    )
+    embedding_column = ', b.embedding' if with_embeddings else ''
+
+    cur.execute(f"""
+        WITH rated (centroid_idx, cluster_id) AS (
+            VALUES {values}
+        ),
+        {candidates},
+        ranked AS (
+            SELECT centroid_idx, id,
+                   ROW_NUMBER() OVER (PARTITION BY centroid_idx ORDER BY distance) AS rn
+            FROM scored
+        ),
+        nearest AS (
+            SELECT centroid_idx, id, rn
+            FROM ranked
+            WHERE rn <= %(per_centroid)s
+        )
+        SELECT n.centroid_idx, b.id, b.title, b.description, a.cluster_id{embedding_column}
+        FROM nearest n
+        JOIN blog_posts b ON b.id = n.id
+        LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %(version)s
+        ORDER BY n.centroid_idx, n.rn
+    """, {'version': version, 'probes': MULTI_VECTOR_PROBES, 'per_centroid': per_centroid})
+
+    ranked_lists = {idx: [] for idx in rated}
+    for row in cur.fetchall():
+        ranked_lists[row[0]].append(row[1:])
+    return ranked_lists
+
+
+def multi_vector_candidates(cur, version, cluster_ids, weights, limit, with_embeddings=False):
+    """Nearest posts for each positively rated centroid, fused by rating.
+
+    Approximate k-NN in the style of an IVF index: each rated centroid is
+    ranked against the members of its MULTI_VECTOR_PROBES nearest clusters
+    (its own included), all centroids in one round-trip, so the query scores
+    a fraction of blog_posts instead of every post once per centroid. A
+    centroid whose probed clusters hold fewer than the requested depth is
+    re-ranked with an exact scan over all posts. Lists are merged with
+    rating-weighted reciprocal rank fusion and deduplicated by post id.
+    """
+    positive = [i for i, weight in enumerate(weights) if weight >= MULTI_VECTOR_MIN_RATING]
+    if not positive:
+        positive = [int(np.argmax(weights))]
+
+    # Deep enough per centroid that the fused list can fill the limit
+    per_centroid = max(25, -(-limit // len(positive)))
+
+    rated = {i: cluster_ids[i] for i in positive}
+    ranked_lists = nearest_per_centroid(cur, version, rated, per_centroid,
+                                        PROBED_CANDIDATES, with_embeddings)
+
+    short = {i: rated[i] for i in positive if len(ranked_lists[i]) < per_centroid}
+    if short:
+        ranked_lists.update(nearest_per_centroid(cur, version, short, per_centroid,
+                                                 EXACT_CANDIDATES, with_embeddings))
+
+    items, scores = weighted_rank_fusion(
+        [ranked_lists[i] for i in positive],
+        [weights[i] for i in positive]
+    )
+    return items[:limit], scores[:limit]
+
+@lru_cache(maxsize=QUERY_EMBEDDING_CACHE_SIZE)
+def embed_query(text):
+    """Embed a normalized search query, caching popular queries in memory"""
+    client = get_openai_client()
+    response = client.embeddings.create(model=EMBEDDING_MODEL, input=text)
+    return tuple(response.data[0].embedding)
+
 @app.route('/')
 def index():
     """Serve the main UI"""
@@ -33,17 +160,22 @@ def get_stats():
         conn = get_db_connection()
         cur = conn.cursor()
 
+        with span('version_lookup'):
+            version = cluster_versions.current_version(cur)
+
         # Get basic stats
-        cur.execute("""
-            SELECT
-                COUNT(*) as total_posts,
-                COUNT(embedding) as posts_with_embeddings,
-                COUNT(DISTINCT cluster_id) as num_clusters,
-                COUNT(DISTINCT category) as num_categories
-            FROM blog_posts
-            WHERE embedding IS NOT NULL
-        """)
-        stats = cur.fetchone()
+        with span('stats_query'):
+            cur.execute("""
+                SELECT
+                    COUNT(*) as total_posts,
+                    COUNT(b.embedding) as posts_with_embeddings,
+                    COUNT(DISTINCT a.cluster_id) as num_clusters,
+                    COUNT(DISTINCT b.category) as num_categories
+                FROM blog_posts b
+                LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %s
+                WHERE b.embedding IS NOT NULL
+            """, (version,))
+            stats = cur.fetchone()
 
         # Get embedding dimensions from config
         dimensions = (EMBEDDING_DIMENSIONS,)
@@ -54,6 +186,7 @@ def get_stats():
             'num_clusters': stats[2],
             'num_categories': stats[3],
             'embedding_dimensions': dimensions[0] if dimensions else 0,
+            'cluster_version': version,
             'embedding_model': EMBEDDING_MODEL
         }
 
@@ -71,32 +204,41 @@ def get_clusters():
         conn = get_db_connection()
         cur = conn.cursor()
 
+        # Pin the published version so every query below reads the same clustering
+        with span('version_lookup'):
+            version = cluster_versions.current_version(cur)
+
         # Get cluster summaries
-        cur.execute("""
-            SELECT cluster_id, summary
-            FROM blog_cluster_summaries
-            ORDER BY cluster_id
-        """)
-        clusters = cur.fetchall()
+        with span('summaries_query'):
+            cur.execute("""
+                SELECT cluster_id, summary
+                FROM blog_cluster_summaries
+                WHERE version = %s
+                ORDER BY cluster_id
+            """, (version,))
+            clusters = cur.fetchall()
 
         result = []
         for cluster_id, summary in clusters:
             # Get sample posts for this cluster
-            cur.execute("""
-                SELECT title, description
-                FROM blog_posts
-                WHERE cluster_id = %s AND embedding IS NOT NULL
-                LIMIT 5
-            """, (cluster_id,))
-            sample_posts = cur.fetchall()
+            with span('samples_query'):
+                cur.execute("""
+                    SELECT b.title, b.description
+                    FROM blog_cluster_assignments a
+                    JOIN blog_posts b ON b.id = a.post_id
+                    WHERE a.version = %s AND a.cluster_id = %s AND b.embedding IS NOT NULL
+                    LIMIT 5
+                """, (version, cluster_id))
+                sample_posts = cur.fetchall()
 
             # Get cluster size
-            cur.execute("""
-                SELECT COUNT(*)
-                FROM blog_posts
-                WHERE cluster_id = %s
-            """, (cluster_id,))
-            cluster_size = cur.fetchone()[0]
+            with span('size_query'):
+                cur.execute("""
+                    SELECT COUNT(*)
+                    FROM blog_cluster_assignments
+                    WHERE version = %s AND cluster_id = %s
+                """, (version, cluster_id))
+                cluster_size = cur.fetchone()[0]
 
             result.append({
                 'cluster_id': cluster_id,
@@ -122,20 +264,50 @@ def get_recommendations():
 
         ratings = ratings_data['ratings']
 
+        # 'single' ranks against one averaged preference vector, 'multi' runs
+        # one k-NN query per positively rated centroid and fuses the lists
+        retrieval = ratings_data.get('retrieval', 'single')
+        if retrieval not in ('single', 'multi'):
+            return jsonify({'error': "retrieval must be 'single' or 'multi'"}), 400
+
+        # Optional diversity reranking over a larger candidate pool
+        rerank = ratings_data.get('rerank')
+        if rerank is not None and rerank not in RERANK_STRATEGIES:
+            return jsonify({'error': f"rerank must be one of: {', '.join(RERANK_STRATEGIES)}"}), 400
+
+        try:
+            mmr_lambda = float(ratings_data.get('mmr_lambda', RERANK_MMR_LAMBDA))
+            pool_size = int(ratings_data.get('pool_size', RERANK_POOL_SIZE))
+            max_per_cluster = int(ratings_data.get('max_per_cluster', RERANK_MAX_PER_CLUSTER))
+        except (TypeError, ValueError, OverflowError):
+            return jsonify({'error': 'mmr_lambda, pool_size and max_per_cluster must be numbers'}), 400
+
+        if not math.isfinite(mmr_lambda) or mmr_lambda < 0 or mmr_lambda > 1:
+            return jsonify({'error': 'mmr_lambda must be between 0 and 1'}), 400
+
+        if pool_size < 25 or pool_size > 1000:
+            return jsonify({'error': 'pool_size must be between 25 and 1000'}), 400
+
+        if max_per_cluster < 1:
+            return jsonify({'error': 'max_per_cluster must be at least 1'}), 400
+
         conn = get_db_connection()
         cur = conn.cursor()
 
-        # Get cluster centroids and compute preference vector
-        cur.execute("""
-            SELECT c.cluster_id, s.summary, AVG(b.embedding)::vector
-            FROM blog_cluster_summaries s
-            JOIN blog_posts b ON b.cluster_id = s.cluster_id
-            JOIN (SELECT DISTINCT cluster_id FROM blog_cluster_summaries) c ON c.cluster_id = s.cluster_id
-            WHERE b.embedding IS NOT NULL
-            GROUP BY c.cluster_id, s.summary
-            ORDER BY c.cluster_id
-        """)
-        clusters = cur.fetchall()
+        # Pin the published version so every query below reads the same clustering
+        with span('version_lookup'):
+            version = cluster_versions.current_version(cur)
+
+        # Get cluster centroids (materialized at publish time) and compute preference vector
+        with span('centroid_query'):
+            cur.execute("""
+                SELECT s.cluster_id, s.summary, c.centroid
+                FROM blog_cluster_summaries s
+                JOIN blog_cluster_centroids c ON c.version = s.version AND c.cluster_id = s.cluster_id
+                WHERE s.version = %s
+                ORDER BY s.cluster_id
+            """, (version,))
+            clusters = cur.fetchall()
 
         # Build preference vector
         embeddings = []
@@ -157,32 +329,70 @@ def get_recommendations():
             return jsonify({'error': 'No valid ratings provided'}), 400
 
         # Compute weighted preference vector
-        embeddings = np.array(embeddings)
-        weights = np.array(weights, dtype=float)
-        preference_vec = np.average(embeddings, axis=0, weights=weights)
+        with span('preference_vector'):
+            embeddings = np.array(embeddings)
+            weights = np.array(weights, dtype=float)
+            preference_vec = np.average(embeddings, axis=0, weights=weights)
 
-        # Convert to pgvector format
-        pref_vec = Vector(preference_vec.tolist())
+            # Convert to pgvector format
+            pref_vec = Vector(preference_vec.tolist())
 
         # Get most similar articles
-        cur.execute("""
-            SELECT id, title, description, cluster_id
-            FROM blog_posts
-            WHERE embedding IS NOT NULL
-            ORDER BY embedding <-> %s ASC
-            LIMIT 25
-        """, (pref_vec,))
-        most_interesting = cur.fetchall()
+        relevance = None
+        if retrieval == 'multi':
+            with span('multi_vector_query'):
+                candidates, fused_scores = multi_vector_candidates(
+                    cur, version, [info['cluster_id'] for info in cluster_info], weights,
+                    pool_size if rerank else 25,
+                    with_embeddings=bool(rerank)
+                )
+            if len(fused_scores):
+                relevance = fused_scores / fused_scores[0]
+        elif rerank:
+            with span('nearest_query'):
+                cur.execute("""
+                    SELECT b.id, b.title, b.description, a.cluster_id, b.embedding
+                    FROM blog_posts b
+                    LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %s
+                    WHERE b.embedding IS NOT NULL
+                    ORDER BY b.embedding <-> %s ASC
+                    LIMIT %s
+                """, (version, pref_vec, pool_size))
+                candidates = cur.fetchall()
+        else:
+            with span('nearest_query'):
+                cur.execute("""
+                    SELECT b.id, b.title, b.description, a.cluster_id
+                    FROM blog_posts b
+                    LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %s
+                    WHERE b.embedding IS NOT NULL
+                    ORDER BY b.embedding <-> %s ASC
+                    LIMIT 25
+                """, (version, pref_vec))
+                candidates = cur.fetchall()
+
+        if rerank:
+            with span('rerank'):
+                if rerank == 'mmr':
+                    order = mmr(preference_vec, [row[4] for row in candidates], 25, mmr_lambda,
+                                relevance=relevance)
+                else:
+                    order = cluster_quota([row[3] for row in candidates], 25, max_per_cluster)
+                most_interesting = [candidates[i][:4] for i in order]
+        else:
+            most_interesting = candidates
 
         # Get least similar articles
-        cur.execute("""
-            SELECT id, title, description, cluster_id
-            FROM blog_posts
-            WHERE embedding IS NOT NULL
-            ORDER BY embedding <-> %s DESC
-            LIMIT 25
-        """, (pref_vec,))
-        least_interesting = cur.fetchall()
+        with span('farthest_query'):
+            cur.execute("""
+                SELECT b.id, b.title, b.description, a.cluster_id
+                FROM blog_posts b
+                LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %s
+                WHERE b.embedding IS NOT NULL
+                ORDER BY b.embedding <-> %s DESC
+                LIMIT 25
+            """, (version, pref_vec))
+            least_interesting = cur.fetchall()
 
         # Calculate preference stats
         avg_rating = np.mean(weights)
@@ -192,8 +402,16 @@ def get_recommendations():
             'preference_stats': {
                 'average_rating': float(avg_rating),
                 'total_clusters_rated': total_clusters_rated,
+                'retrieval': retrieval,
+                'cluster_version': version,
                 'cluster_breakdown': cluster_info
             },
+            'reranking': {
+                'strategy': rerank,
+                'pool_size': pool_size,
+                'mmr_lambda': mmr_lambda,
+                'max_per_cluster': max_per_cluster
+            } if rerank else None,
             'most_interesting': [
                 {
                     'id': row[0],
@@ -221,9 +439,96 @@ def get_recommendations():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/search', methods=['GET'])
+def search_posts():
+    """Hybrid full-text + vector search fused with reciprocal rank fusion"""
+    try:
+        query = ' '.join(request.args.get('q', '').split())
+        if not query:
+            return jsonify({'error': 'q parameter required'}), 400
+
+        try:
+            limit = int(request.args.get('limit', 25))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'limit must be an integer'}), 400
+        if limit < 1 or limit > 100:
+            return jsonify({'error': 'limit must be between 1 and 100'}), 400
+
+        # Each retriever contributes a deeper list than the final page
+        depth = max(SEARCH_CANDIDATES, limit)
+
+        # Embed the query (cached); fall back to text-only search if the model is unavailable
+        query_vec = None
+        try:
+            with span('query_embedding'):
+                query_vec = Vector(list(embed_query(query.lower())))
+        except Exception as e:
+            print(f"Error embedding search query, using full-text only: {e}")
+
+        conn = get_db_connection()
+        cur = conn.cursor()
+        with span('version_lookup'):
+            version = cluster_versions.current_version(cur)
+
+        with span('fulltext_query'):
+            cur.execute("""
+                SELECT b.id, b.title, b.description, a.cluster_id
+                FROM blog_posts b
+                LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %s
+                WHERE b.search_tsv @@ websearch_to_tsquery('english', %s)
+                ORDER BY ts_rank_cd(b.search_tsv, websearch_to_tsquery('english', %s)) DESC
+                LIMIT %s
+            """, (version, query, query, depth))
+            text_matches = cur.fetchall()
+
+        vector_matches = []
+        if query_vec is not None:
+            with span('vector_query'):
+                cur.execute("""
+                    SELECT b.id, b.title, b.description, a.cluster_id
+                    FROM blog_posts b
+                    LEFT JOIN blog_cluster_assignments a ON a.post_id = b.id AND a.version = %s
+                    WHERE b.embedding IS NOT NULL
+                    ORDER BY b.embedding <-> %s ASC
+                    LIMIT %s
+                """, (version, query_vec, depth))
+                vector_matches = cur.fetchall()
+
+        cur.close()
+        conn.close()
+
+        results, scores = weighted_rank_fusion([text_matches, vector_matches], [1.0, 1.0])
+        text_ranks = {row[0]: rank for rank, row in enumerate(text_matches, start=1)}
+        vector_ranks = {row[0]: rank for rank, row in enumerate(vector_matches, start=1)}
+
+        return jsonify({
+            'query': query,
+            'vector_search': query_vec is not None,
+            'results': [
+                {
+                    'id': row[0],
+                    'title': row[1],
+                    'description': row[2],
+                    'cluster_id': row[3],
+                    'score': float(score),
+                    'text_rank': text_ranks.get(row[0]),
+                    'vector_rank': vector_ranks.get(row[0])
+                }
+                for row, score in zip(results[:limit], scores[:limit])
+            ]
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/recluster', methods=['POST'])
 def recluster_data():
-    """Re-cluster the blog posts with a different number of clusters"""
+    """Re-cluster the blog posts into a new, staged clustering version.
+
+    The published version keeps serving readers until the new one has its
+    summaries and is published by /api/generate_summaries (or immediately
+    when "publish": true is passed).
+    """
     try:
         data = request.get_json()
         if not data or 'num_clusters' not in data:
@@ -233,65 +538,72 @@ def recluster_data():
         if num_clusters < 2 or num_clusters > 50:
             return jsonify({'error': 'num_clusters must be between 2 and 50'}), 400
 
+        # Only a real JSON boolean: "false" or 0 must not publish a version without summaries
+        publish = data.get('publish', False)
+        if not isinstance(publish, bool):
+            return jsonify({'error': 'publish must be true or false'}), 400
+
         conn = get_db_connection()
         cur = conn.cursor()
 
-        # Clear existing cluster assignments
-        cur.execute("UPDATE blog_posts SET cluster_id = NULL")
-
-        # Delete existing cluster summaries
-        cur.execute("DELETE FROM blog_cluster_summaries")
+        # Register a new version; existing assignments are left untouched
+        version = cluster_versions.create_version(cur, num_clusters)
 
-        # Run kmeans clustering with new number of clusters
-        cur.execute("""
-            WITH data AS (
-                SELECT id,
-                       string_to_array(trim(both '[]' from embedding::text), ',')::float8[] AS vec
-                FROM blog_posts
-                WHERE embedding IS NOT NULL
-            ),
-            agg AS (
-                SELECT array_agg(vec) AS all_vecs, array_agg(id) AS all_ids
-                FROM data
-            ),
-            clusters AS (
-                SELECT t.cluster_id, t.rn
-                FROM (
-                    SELECT unnest(kmeans_assign(all_vecs, %s, 100)) AS cluster_id,
-                           generate_subscripts(all_ids, 1) AS rn
-                    FROM agg
-                ) t
-            ),
-            mapping AS (
-                SELECT all_ids[rn] AS id, cluster_id
+        # Run kmeans clustering and append the assignments under the new version
+        with span('kmeans_insert'):
+            cur.execute("""
+                INSERT INTO blog_cluster_assignments (version, post_id, cluster_id)
+                WITH data AS (
+                    SELECT id,
+                           string_to_array(trim(both '[]' from embedding::text), ',')::float8[] AS vec
+                    FROM blog_posts
+                    WHERE embedding IS NOT NULL
+                ),
+                agg AS (
+                    SELECT array_agg(vec) AS all_vecs, array_agg(id) AS all_ids
+                    FROM data
+                ),
+                clusters AS (
+                    SELECT t.cluster_id, t.rn
+                    FROM (
+                        SELECT unnest(kmeans_assign(all_vecs, %s, 100)) AS cluster_id,
+                               generate_subscripts(all_ids, 1) AS rn
+                        FROM agg
+                    ) t
+                )
+                SELECT %s, all_ids[rn], cluster_id
                 FROM clusters, agg
-            )
-            UPDATE blog_posts p
-            SET cluster_id = m.cluster_id
-            FROM mapping m
-            WHERE p.id = m.id
-        """, (num_clusters,))
+            """, (num_clusters, version))
 
-        conn.commit()
+            versions_removed = 0
+            if publish:
+                cluster_versions.publish_version(cur, version)
+                versions_removed = cluster_versions.garbage_collect(cur)
+
+            conn.commit()
 
         # Get cluster distribution
-        cur.execute("""
-            SELECT cluster_id, COUNT(*) as size
-            FROM blog_posts
-            WHERE cluster_id IS NOT NULL
-            GROUP BY cluster_id
-            ORDER BY cluster_id
-        """)
-        cluster_sizes = cur.fetchall()
+        with span('distribution_query'):
+            cur.execute("""
+                SELECT cluster_id, COUNT(*) as size
+                FROM blog_cluster_assignments
+                WHERE version = %s
+                GROUP BY cluster_id
+                ORDER BY cluster_id
+            """, (version,))
+            cluster_sizes = cur.fetchall()
 
         cur.close()
         conn.close()
 
         return jsonify({
             'success': True,
+            'version': version,
+            'published': publish,
+            'versions_removed': versions_removed,
             'num_clusters': num_clusters,
             'cluster_sizes': [{'cluster_id': row[0], 'size': row[1]} for row in cluster_sizes],
-            'message': f'Successfully re-clustered data into {num_clusters} clusters'
+            'message': f'Successfully re-clustered data into {num_clusters} clusters (version {version})'
         })
 
     except Exception as e:
@@ -299,27 +611,61 @@ def recluster_data():
 
 @app.route('/api/generate_summaries', methods=['POST'])
 def generate_summaries():
-    """Generate summaries for the current clusters"""
+    """Generate summaries for the newest clustering version and publish it.
+
+    The version is published, together with its summaries, in one commit
+    once every cluster has a summary; otherwise it stays staged and the
+    call can be retried.
+    """
     try:
+        data = request.get_json(silent=True) or {}
+
+        version = data.get('version')
+        if version is not None:
+            try:
+                version = int(version)
+            except (TypeError, ValueError):
+                return jsonify({'error': 'version must be an integer'}), 400
+
         conn = get_db_connection()
         cur = conn.cursor()
 
+        with span('version_lookup'):
+            if version is None:
+                version = cluster_versions.latest_version(cur)
+                error = 'No clustering found - run /api/recluster first' if version is None else None
+            elif not cluster_versions.version_exists(cur, version):
+                error = f'Unknown clustering version {version}'
+            else:
+                error = None
+        if error:
+            cur.close()
+            conn.close()
+            return jsonify({'error': error}), 400
+
         # Get all cluster IDs
-        cur.execute("SELECT DISTINCT cluster_id FROM blog_posts WHERE cluster_id IS NOT NULL ORDER BY cluster_id")
+        cur.execute("""
+            SELECT DISTINCT cluster_id
+            FROM blog_cluster_assignments
+            WHERE version = %s
+            ORDER BY cluster_id
+        """, (version,))
         cluster_ids = [row[0] for row in cur.fetchall()]
 
         summaries_generated = 0
 
         for cluster_id in cluster_ids:
             # Get sample posts for this cluster
-            cur.execute("""
-                SELECT title, description
-                FROM blog_posts
-                WHERE cluster_id = %s AND embedding IS NOT NULL
-                LIMIT %s
-            """, (cluster_id, CLUSTER_SAMPLE_SIZE))
-
-            posts = cur.fetchall()
+            with span('samples_query'):
+                cur.execute("""
+                    SELECT b.title, b.description
+                    FROM blog_cluster_assignments a
+                    JOIN blog_posts b ON b.id = a.post_id
+                    WHERE a.version = %s AND a.cluster_id = %s AND b.embedding IS NOT NULL
+                    LIMIT %s
+                """, (version, cluster_id, CLUSTER_SAMPLE_SIZE))
+
+                posts = cur.fetchall()
             if not posts:
                 continue
 
@@ -335,21 +681,22 @@ Please provide a 2-3 sentence summary that captures the main themes, topics, and
             try:
                 # Generate summary using the configured client
                 client = get_openai_client()
-                response = client.chat.completions.create(
-                    model=CHAT_MODEL,
-                    messages=[{"role": "user", "content": prompt}],
-                    max_tokens=200,
-                    temperature=0.3
-                )
+                with span('chat_completion'):
+                    response = client.chat.completions.create(
+                        model=CHAT_MODEL,
+                        messages=[{"role": "user", "content": prompt}],
+                        max_tokens=200,
+                        temperature=0.3
+                    )
 
                 summary = response.choices[0].message.content.strip()
 
                 # Insert summary into database
                 cur.execute("""
-                    INSERT INTO blog_cluster_summaries (cluster_id, summary)
-                    VALUES (%s, %s)
-                    ON CONFLICT (cluster_id) DO UPDATE SET summary = EXCLUDED.summary
-                """, (cluster_id, summary))
+                    INSERT INTO blog_cluster_summaries (version, cluster_id, summary)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT (version, cluster_id) DO UPDATE SET summary = EXCLUDED.summary
+                """, (version, cluster_id, summary))
 
                 summaries_generated += 1
 
@@ -357,20 +704,58 @@ Please provide a 2-3 sentence summary that captures the main themes, topics, and
                 print(f"Error generating summary for cluster {cluster_id}: {e}")
                 continue
 
+        # Publish only a complete version: every cluster must have a summary
+        cur.execute("SELECT COUNT(*) FROM blog_cluster_summaries WHERE version = %s", (version,))
+        published = bool(cluster_ids) and cur.fetchone()[0] >= len(cluster_ids)
+        versions_removed = 0
+        if published:
+            cluster_versions.publish_version(cur, version)
+            versions_removed = cluster_versions.garbage_collect(cur)
+
         conn.commit()
         cur.close()
         conn.close()
 
         return jsonify({
             'success': True,
+            'version': version,
+            'published': published,
+            'versions_removed': versions_removed,
             'summaries_generated': summaries_generated,
             'total_clusters': len(cluster_ids),
             'message': f'Generated {summaries_generated} cluster summaries'
+                       + ('' if published else f' (version {version} not published: summaries incomplete)')
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Expose request and stage latency histograms in Prometheus text format"""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/api/diagnostics/queries', methods=['GET'])
+def get_query_diagnostics():
+    """Aggregated per-statement timings and last sampled plans"""
+    if not QUERY_DIAGNOSTICS_ENABLED:
+        return jsonify({'error': 'Query diagnostics are disabled (set QUERY_DIAGNOSTICS_ENABLED=true)'}), 404
+
+    return jsonify({
+        'slow_query_ms': SLOW_QUERY_MS,
+        'explain_sample_rate': EXPLAIN_SAMPLE_RATE,
+        'statements': query_diagnostics.report()
+    })
+
+@app.route('/api/diagnostics/queries', methods=['DELETE'])
+def reset_query_diagnostics():
+    """Clear the aggregated statement report"""
+    if not QUERY_DIAGNOSTICS_ENABLED:
+        return jsonify({'error': 'Query diagnostics are disabled (set QUERY_DIAGNOSTICS_ENABLED=true)'}), 404
+
+    query_diagnostics.reset()
+    return jsonify({'success': True})
+
 @app.route('/api/export', methods=['POST'])
 def export_recommendations():
     """Export recommendations as JSON"""